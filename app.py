@@ -1,10 +1,13 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify
 from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime, date
 import json
 import os
-from fetcher import check_all_sites
+import queue
+import events
+from fetcher import check_all_sites, unsaved_results
 from notifier import send_digest_email
+from dotenv import load_dotenv
 
 app = Flask(__name__)
 
@@ -13,25 +16,29 @@ CONFIG_FILE = os.path.join(DATA_DIR, 'config.json')
 SNAPSHOTS_FILE = os.path.join(DATA_DIR, 'snapshots.json')
 METADATA_FILE = os.path.join(DATA_DIR, 'metadata.json')
 
-# Ensure data directory exists
-os.makedirs(DATA_DIR, exist_ok=True)
+# Seconds between keep-alive comments on idle event streams
+EVENT_KEEPALIVE = 15
 
-# Initialize files if they don't exist
-if not os.path.exists(CONFIG_FILE):
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump({'sites': []}, f, indent=2)
+# Started by start_scheduler() when the app is run, never on import
+scheduler = None
 
-if not os.path.exists(SNAPSHOTS_FILE):
-    with open(SNAPSHOTS_FILE, 'w') as f:
-        json.dump({}, f, indent=2)
+def init_data_files():
+    """Create the data directory and empty data files if they don't exist"""
+    # Ensure data directory exists
+    os.makedirs(DATA_DIR, exist_ok=True)
 
-if not os.path.exists(METADATA_FILE):
-    with open(METADATA_FILE, 'w') as f:
-        json.dump({'last_check_date': None}, f, indent=2)
+    # Initialize files if they don't exist
+    if not os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE, 'w') as f:
+            json.dump({'sites': []}, f, indent=2)
 
-# Scheduler setup
-scheduler = BackgroundScheduler()
-scheduler.start()
+    if not os.path.exists(SNAPSHOTS_FILE):
+        with open(SNAPSHOTS_FILE, 'w') as f:
+            json.dump({}, f, indent=2)
+
+    if not os.path.exists(METADATA_FILE):
+        with open(METADATA_FILE, 'w') as f:
+            json.dump({'last_check_date': None}, f, indent=2)
 
 def load_config():
     with open(CONFIG_FILE, 'r') as f:
@@ -77,11 +84,17 @@ def daily_check_job():
     else:
         print("No changes detected.")
 
-# Schedule daily check at 9 AM
-# misfire_grace_time=3600 allows the job to fire up to 1 hour late (e.g. if system was briefly slow)
-# coalesce=True prevents multiple firings if several were missed
-scheduler.add_job(daily_check_job, 'cron', hour=9, minute=0, id='daily_check',
-                  misfire_grace_time=3600, coalesce=True)
+def start_scheduler():
+    """Start the background scheduler with the daily check job"""
+    global scheduler
+    scheduler = BackgroundScheduler()
+    scheduler.start()
+
+    # Schedule daily check at 9 AM
+    # misfire_grace_time=3600 allows the job to fire up to 1 hour late (e.g. if system was briefly slow)
+    # coalesce=True prevents multiple firings if several were missed
+    scheduler.add_job(daily_check_job, 'cron', hour=9, minute=0, id='daily_check',
+                      misfire_grace_time=3600, coalesce=True)
 
 def startup_check():
     """Run check on startup if we haven't checked today"""
@@ -123,6 +136,19 @@ def index():
     
     return render_template('index.html', sites=config['sites'])
 
+def enrich_site(site, snapshots):
+    """Add last check, last change and status from snapshots to a site entry"""
+    url = site['url']
+    if url in snapshots:
+        site['last_check'] = snapshots[url].get('last_check', 'Never')
+        site['last_changed'] = snapshots[url].get('last_changed')
+        site['status'] = snapshots[url].get('status', 'unknown')
+    else:
+        site['last_check'] = 'Never'
+        site['last_changed'] = None
+        site['status'] = 'new'
+    return site
+
 @app.route('/api/sites', methods=['GET'])
 def get_sites():
     config = load_config()
@@ -131,17 +157,19 @@ def get_sites():
     with open(SNAPSHOTS_FILE, 'r') as f:
         snapshots = json.load(f)
 
+    # Overlay results from a check that is still running, so a dashboard
+    # resyncing mid-run doesn't miss the events published so far
+    unsaved = unsaved_results()
+    for site in config['sites']:
+        result = unsaved.get(site['url'], {})
+        if 'snapshot' in result:
+            snapshots[site['url']] = result['snapshot']
+        if 'title' in result and not site.get('title_locked'):
+            site['title'] = result['title']
+
     # Enrich sites with status info
     for site in config['sites']:
-        url = site['url']
-        if url in snapshots:
-            site['last_check'] = snapshots[url].get('last_check', 'Never')
-            site['last_changed'] = snapshots[url].get('last_changed')
-            site['status'] = snapshots[url].get('status', 'unknown')
-        else:
-            site['last_check'] = 'Never'
-            site['last_changed'] = None
-            site['status'] = 'new'
+        enrich_site(site, snapshots)
 
     response = jsonify(config['sites'])
     # Prevent caching
@@ -183,6 +211,7 @@ def add_site():
     config['sites'].append(site_config)
 
     save_config(config)
+    events.publish('site_added', {'site': enrich_site(dict(site_config), {})})
     return jsonify({'success': True})
 
 @app.route('/api/sites/<int:index>', methods=['DELETE'])
@@ -204,6 +233,7 @@ def delete_site(index):
         with open(SNAPSHOTS_FILE, 'w') as f:
             json.dump(snapshots, f, indent=2)
 
+    events.publish('site_removed', {'url': removed['url']})
     return jsonify({'success': True})
 
 @app.route('/api/sites/<int:index>/title', methods=['PATCH'])
@@ -222,6 +252,7 @@ def update_title(index):
     config['sites'][index]['title'] = new_title
     config['sites'][index]['title_locked'] = True
     save_config(config)
+    events.publish('site_title', {'url': config['sites'][index]['url'], 'title': new_title})
 
     return jsonify({'success': True, 'title': new_title})
 
@@ -240,9 +271,36 @@ def update_category(index):
 
     config['sites'][index]['category'] = new_category
     save_config(config)
+    events.publish('site_category', {'url': config['sites'][index]['url'], 'category': new_category})
 
     return jsonify({'success': True, 'category': new_category})
 
+@app.route('/api/events')
+def event_stream():
+    """Server-Sent Events stream of site changes for open dashboards"""
+    def stream():
+        q = events.broker.subscribe()
+        try:
+            # Tell the browser how long to wait before reconnecting
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    message = q.get(timeout=EVENT_KEEPALIVE)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                if message is None:
+                    # Dropped for falling behind; the browser reconnects and resyncs
+                    break
+                yield message
+        finally:
+            events.broker.unsubscribe(q)
+
+    response = Response(stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route('/api/check-now', methods=['POST'])
 def check_now():
     """Manually trigger a check of all sites"""
@@ -263,6 +321,10 @@ def check_now():
         })
 
 if __name__ == '__main__':
+    load_dotenv()
+    init_data_files()
+    start_scheduler()
+
     print("=" * 50)
     print("Website Monitor Started")
     print("=" * 50)
@@ -0,0 +1,96 @@
+import os
+import tempfile
+
+# On-disk cache of recent raw response bodies, keyed by the body's own digest.
+# Lets checks be re-run offline (e.g. after changing a selector) without refetching.
+BODY_CACHE_DIR = os.path.join('data', 'bodies')
+
+def max_bytes():
+    """Size cap from BODY_CACHE_MB; 0 (the default) disables the cache.
+    Read on use, so entry points can load .env first."""
+    return int(os.getenv('BODY_CACHE_MB', '0')) * 1024 * 1024
+
+def enabled():
+    return max_bytes() > 0
+
+def _path(digest):
+    return os.path.join(BODY_CACHE_DIR, digest)
+
+# The cache is optional: any filesystem error is logged and the check carries on
+
+def get(digest):
+    """Return the cached body for digest, or None if it isn't cached"""
+    path = _path(digest)
+    try:
+        with open(path, 'rb') as f:
+            body = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        print(f"  Body cache read failed: {e}")
+        return None
+
+    # Mark as recently used so eviction keeps it
+    try:
+        os.utime(path)
+    except OSError as e:
+        print(f"  Body cache touch failed: {e}")
+    return body
+
+def put(digest, body):
+    """Store a raw body under its digest (no-op when the cache is disabled)"""
+    if not enabled():
+        return
+
+    path = _path(digest)
+    tmp_path = None
+    try:
+        if os.path.exists(path):
+            os.utime(path)
+            return
+
+        os.makedirs(BODY_CACHE_DIR, exist_ok=True)
+        # Unique temp name, so overlapping runs storing the same body don't collide
+        fd, tmp_path = tempfile.mkstemp(dir=BODY_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"  Body cache write failed: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+def evict():
+    """Delete least recently used bodies until the cache fits its size cap"""
+    entries = []
+    total = 0
+    try:
+        for entry in os.scandir(BODY_CACHE_DIR):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+    except FileNotFoundError:
+        return 0
+    except OSError as e:
+        print(f"Body cache eviction failed: {e}")
+        return 0
+
+    limit = max_bytes()
+    removed = 0
+    for mtime, size, path in sorted(entries):
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass  # Already evicted by an overlapping run
+        except OSError as e:
+            print(f"Body cache eviction failed: {e}")
+            continue
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,231 @@
+"""
+Website Monitor command line
+One-off checks, site import/export, email test and benchmarks without
+starting the web app or scheduler. Heavy modules (HTML parser, HTTP, SMTP)
+are only imported by the commands that use them.
+
+Usage:
+    python cli.py check [--site URL] [--offline] [--email]
+    python cli.py import FILE [--category NAME]
+    python cli.py export [FILE]
+    python cli.py test-email
+    python cli.py bench [--site URL] [--repeat N]
+"""
+
+import argparse
+import json
+import os
+import sys
+
+def normalize_url(url):
+    """Auto-prepend https:// if no scheme provided (same as the web GUI)"""
+    url = url.strip()
+    if not url.startswith('http://') and not url.startswith('https://'):
+        url = 'https://' + url
+    return url
+
+def positive_int(value):
+    """argparse type for counts that must be at least 1"""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+def is_site_entry(entry):
+    """True for an importable entry: a URL string or a site object with a url"""
+    return isinstance(entry, str) or (isinstance(entry, dict) and isinstance(entry.get('url'), str))
+
+def load_sites(fetcher, site=None):
+    """Return configured sites, optionally only the one matching --site"""
+    if not os.path.exists(fetcher.CONFIG_FILE):
+        print(f"No config found at {fetcher.CONFIG_FILE} - add sites first")
+        sys.exit(1)
+
+    sites = fetcher.load_config()['sites']
+    if site:
+        url = normalize_url(site)
+        sites = [s for s in sites if s['url'] == url]
+        if not sites:
+            print(f"Site not monitored: {url}")
+            sys.exit(1)
+    return sites
+
+def cmd_check(args):
+    import fetcher
+
+    urls = None
+    if args.site:
+        urls = [s['url'] for s in load_sites(fetcher, args.site)]
+    else:
+        load_sites(fetcher)
+
+    changes = fetcher.check_all_sites(offline=args.offline, urls=urls)
+
+    if changes:
+        print(f"\n{len(changes)} change(s) detected:")
+        for change in changes:
+            print(f"  - {change['url']} ({change['category']})")
+        if args.email:
+            from notifier import send_digest_email
+            send_digest_email(changes)
+    else:
+        print("\nNo changes detected.")
+
+def cmd_import(args):
+    import fetcher
+
+    with open(args.file, 'r') as f:
+        text = f.read()
+
+    # Accept a config export ({"sites": [...]}), a list of sites, or one URL per line
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        lines = [line.strip() for line in text.splitlines()]
+        data = [line for line in lines if line and not line.startswith('#')]
+    if isinstance(data, dict):
+        data = data.get('sites', [])
+
+    if not isinstance(data, list) or not all(is_site_entry(e) for e in data):
+        print(f"Cannot import {args.file}: expected {{\"sites\": [...]}}, a JSON list of "
+              "URLs or site objects, or one URL per line")
+        sys.exit(1)
+
+    if os.path.exists(fetcher.CONFIG_FILE):
+        config = fetcher.load_config()
+    else:
+        os.makedirs(os.path.dirname(fetcher.CONFIG_FILE), exist_ok=True)
+        config = {'sites': []}
+
+    from datetime import datetime
+    existing = {site['url'] for site in config['sites']}
+    added = 0
+    for entry in data:
+        site = dict(entry) if isinstance(entry, dict) else {'url': entry}
+        site['url'] = normalize_url(site.get('url', ''))
+        if site['url'] == 'https://' or site['url'] in existing:
+            continue
+        site.setdefault('category', args.category)
+        site.setdefault('added', datetime.now().isoformat())
+        config['sites'].append(site)
+        existing.add(site['url'])
+        added += 1
+
+    fetcher.save_config(config)
+    print(f"Imported {added} site(s), skipped {len(data) - added}")
+
+def cmd_export(args):
+    import fetcher
+
+    sites = load_sites(fetcher)
+    output = json.dumps({'sites': sites}, indent=2)
+    if args.file:
+        with open(args.file, 'w') as f:
+            f.write(output + '\n')
+        print(f"Exported {len(sites)} site(s) to {args.file}")
+    else:
+        print(output)
+
+def cmd_test_email(args):
+    from email_diagnostic import check_email_config, send_test_email
+
+    if not check_email_config():
+        sys.exit(1)
+    if not send_test_email():
+        sys.exit(1)
+
+def cmd_bench(args):
+    import subprocess
+    import time
+    import fetcher
+    import resolver
+
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    # Startup: fresh interpreters importing what each entry point needs
+    print("=== STARTUP (best of 3) ===\n")
+    for label, code in [('cli check', 'import cli, fetcher'),
+                        ('app import', 'import app')]:
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            proc = subprocess.run([sys.executable, '-c', code], cwd=here, capture_output=True)
+            timings.append(time.perf_counter() - started)
+        status = '' if proc.returncode == 0 else '  (failed: missing dependencies?)'
+        print(f"  {label:<12} {min(timings) * 1000:8.1f} ms{status}")
+
+    # Check pipeline phases, without touching snapshots
+    import requests
+
+    sites = load_sites(fetcher, args.site)
+    print(f"\n=== CHECK PIPELINE ({len(sites)} site(s), {args.repeat} run(s)) ===\n")
+
+    resolver.cache.clear()
+    dns = resolver.prefetch([site['url'] for site in sites])
+    print(f"  DNS prefetch {dns['elapsed'] * 1000:8.1f} ms  ({dns['hosts']} host(s), {dns['failed']} failed)\n")
+
+    for site in sites:
+        url = site['url']
+        selector = site.get('selector')
+        fetch_times, parse_times, skip_times = [], [], []
+        try:
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                with resolver.cached_lookups():
+                    response = requests.get(url, headers=fetcher.REQUEST_HEADERS, timeout=10)
+                fetch_times.append(time.perf_counter() - started)
+
+                encoding = response.encoding or response.apparent_encoding
+                started = time.perf_counter()
+                result = fetcher.process_body(response.content, encoding, selector)
+                parse_times.append(time.perf_counter() - started)
+
+                started = time.perf_counter()
+                fetcher.process_body(response.content, encoding, selector, result['raw_key'])
+                skip_times.append(time.perf_counter() - started)
+        except requests.exceptions.RequestException as e:
+            print(f"  {url}\n    ✗ Error: {e}")
+            continue
+
+        print(f"  {url}")
+        print(f"    fetch {min(fetch_times) * 1000:8.1f} ms   "
+              f"parse {min(parse_times) * 1000:8.1f} ms   "
+              f"identical-body skip {min(skip_times) * 1000:6.2f} ms")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='cli.py', description='Website Monitor command line')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    check = commands.add_parser('check', help='check sites for changes')
+    check.add_argument('--site', help='only check this URL')
+    check.add_argument('--offline', action='store_true', help='re-check from the body cache without fetching')
+    check.add_argument('--email', action='store_true', help='send a digest email if changes are found')
+    check.set_defaults(func=cmd_check)
+
+    import_ = commands.add_parser('import', help='add sites from a JSON export or a list of URLs')
+    import_.add_argument('file')
+    import_.add_argument('--category', default='Uncategorized', help='category for entries without one')
+    import_.set_defaults(func=cmd_import)
+
+    export = commands.add_parser('export', help='write monitored sites as JSON')
+    export.add_argument('file', nargs='?', help='output file (default: stdout)')
+    export.set_defaults(func=cmd_export)
+
+    test_email = commands.add_parser('test-email', help='check email settings and send a test email')
+    test_email.set_defaults(func=cmd_test_email)
+
+    bench = commands.add_parser('bench', help='time startup and each phase of a check')
+    bench.add_argument('--site', help='only benchmark this URL')
+    bench.add_argument('--repeat', type=positive_int, default=3, help='runs per site (default: 3)')
+    bench.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args(argv)
+
+    # Load .env (email settings, BODY_CACHE_MB) before any command runs
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    args.func(args)
+
+if __name__ == '__main__':
+    main()
@@ -7,7 +7,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(__file__))
 
-from notifier import send_digest_email, SMTP_SERVER, SMTP_USERNAME, TO_EMAIL
+from notifier import send_digest_email, email_settings
 from datetime import datetime
 import json
 
@@ -15,11 +15,12 @@ def check_email_config():
     """Check if email configuration looks valid"""
     print("=== EMAIL CONFIGURATION CHECK ===\n")
     
-    print(f"SMTP Server: {SMTP_SERVER}")
-    print(f"SMTP Username: {SMTP_USERNAME}")
-    print(f"To Email: {TO_EMAIL}")
+    settings = email_settings()
+    print(f"SMTP Server: {settings['smtp_server']}")
+    print(f"SMTP Username: {settings['smtp_username']}")
+    print(f"To Email: {settings['to_email']}")
     
-    if not SMTP_USERNAME or not TO_EMAIL:
+    if not settings['smtp_username'] or not settings['to_email']:
         print("\n[ERROR] Email configuration is incomplete!")
         return False
     
@@ -43,7 +44,7 @@ def send_test_email():
     
     if result:
         print("\n[SUCCESS] Test email sent successfully!")
-        print(f"Check your inbox at {TO_EMAIL}")
+        print(f"Check your inbox at {email_settings()['to_email']}")
         return True
     else:
         print("\n[FAILED] Could not send test email")
@@ -113,4 +114,7 @@ def main():
     print("="*60 + "\n")
 
 if __name__ == '__main__':
+    from dotenv import load_dotenv
+    load_dotenv()
+
     main()
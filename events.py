@@ -0,0 +1,48 @@
+import json
+import queue
+import threading
+
+# Events buffered per dashboard before it is considered stalled and dropped.
+# A dropped browser reconnects on its own and resyncs with one full load.
+MAX_PENDING_EVENTS = 500
+
+class EventBroker:
+    """Fan out site change events to connected Server-Sent Events clients"""
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def subscribe(self):
+        """Register a new client and return the queue its events arrive on"""
+        q = queue.Queue(maxsize=MAX_PENDING_EVENTS)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def publish(self, event, data):
+        """Send an event to every client, formatted once as an SSE message"""
+        with self._lock:
+            message = f"id: {self._next_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+            self._next_id += 1
+
+            for q in list(self._subscribers):
+                try:
+                    q.put_nowait(message)
+                except queue.Full:
+                    # Client isn't reading; cut it loose rather than buffer forever
+                    self._subscribers.discard(q)
+                    with q.mutex:
+                        q.queue.clear()
+                    q.put_nowait(None)
+
+# Shared by the web routes and check_all_sites
+broker = EventBroker()
+
+def publish(event, data):
+    broker.publish(event, data)
@@ -1,16 +1,28 @@
-import requests
 import hashlib
 import json
 import os
 import re
+import threading
 from datetime import datetime
-from bs4 import BeautifulSoup
+import resolver
+import events
+import body_cache
 
 SNAPSHOTS_FILE = 'data/snapshots.json'
 CONFIG_FILE = 'data/config.json'
 
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+}
+
+# Bump whenever cleaning/extraction changes, so stored raw-body keys stop
+# matching and every page goes through the full pipeline once more
+NORMALIZATION_VERSION = 1
+
 def clean_html_content(html):
     """Clean HTML content to reduce false positives"""
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, 'html.parser')
 
     # Remove dynamic elements that change frequently
@@ -32,6 +44,8 @@ def clean_html_content(html):
 
 def extract_content_by_selector(html, selector):
     """Extract specific content using CSS selector"""
+    from bs4 import BeautifulSoup
+
     soup = BeautifulSoup(html, 'html.parser')
 
     # Find elements matching the selector
@@ -47,6 +61,8 @@ def extract_content_by_selector(html, selector):
 
 def get_page_title(html):
     """Extract page title from HTML"""
+    from bs4 import BeautifulSoup
+
     try:
         soup = BeautifulSoup(html, 'html.parser')
         title_tag = soup.find('title')
@@ -56,33 +72,77 @@ def get_page_title(html):
     except:
         return None
 
-def get_page_hash(url, selector=None):
-    """Fetch a URL and return its content hash"""
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
+def body_digest(body):
+    """Cheap fingerprint of raw response bytes"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def raw_key(digest, selector, encoding=None):
+    """Key a body digest to the selector/normalization config and the
+    encoding it was decoded with"""
+    config = f"{NORMALIZATION_VERSION}\0{selector or ''}\0{encoding or ''}\0{digest}"
+    return hashlib.blake2b(config.encode('utf-8'), digest_size=16).hexdigest()
 
-        # Extract page title
-        page_title = get_page_title(response.text)
+def hash_content(html, selector=None):
+    """Clean HTML (optionally narrowed by selector) and return its hash and title"""
+    # Extract page title
+    page_title = get_page_title(html)
 
-        # Process content based on selector
-        if selector:
-            content = extract_content_by_selector(response.text, selector)
-        else:
-            content = clean_html_content(response.text)
+    # Process content based on selector
+    if selector:
+        content = extract_content_by_selector(html, selector)
+    else:
+        content = clean_html_content(html)
 
-        # Hash the cleaned content
-        content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    # Hash the cleaned content
+    content_hash = hashlib.sha256(content.encode('utf-8')).hexdigest()
 
-        return {
-            'hash': content_hash,
-            'title': page_title,
-            'status': 'success',
-            'status_code': response.status_code
-        }
+    return {'hash': content_hash, 'title': page_title}
+
+def decode_body(body, encoding):
+    """Decode raw bytes the way requests' response.text does, falling back
+    to UTF-8 when the charset is unknown or missing"""
+    try:
+        return str(body, encoding, errors='replace')
+    except (LookupError, TypeError):
+        return str(body, errors='replace')
+
+def process_body(body, encoding, selector=None, known_raw_key=None):
+    """Hash a raw response body, skipping the parse/clean pipeline when its
+    raw key matches known_raw_key (the key stored from the previous check)"""
+    digest = body_digest(body)
+    key = raw_key(digest, selector, encoding)
+    result = {
+        'status': 'success',
+        'raw_key': key,
+        'body_digest': digest,
+        'encoding': encoding
+    }
+
+    if key == known_raw_key:
+        # Byte-identical body under the same config: content can't have changed
+        result.update({'hash': None, 'title': None, 'unchanged': True})
+        return result
+
+    result.update(hash_content(decode_body(body, encoding), selector))
+    return result
+
+def get_page_hash(url, selector=None, known_raw_key=None):
+    """Fetch a URL and return its content hash"""
+    # Imported here so one-off CLI runs only pay for the HTTP stack when fetching
+    import requests
+
+    try:
+        # Answer DNS lookups from the resolver cache filled by check_all_sites
+        with resolver.cached_lookups():
+            response = requests.get(url, headers=REQUEST_HEADERS, timeout=10)
+        response.raise_for_status()
+
+        # Use the same encoding requests would for response.text
+        encoding = response.encoding or response.apparent_encoding
+        result = process_body(response.content, encoding, selector, known_raw_key)
+        result['status_code'] = response.status_code
+        body_cache.put(result['body_digest'], response.content)
+        return result
     except requests.exceptions.RequestException as e:
         return {
             'hash': None,
@@ -91,6 +151,19 @@ def get_page_hash(url, selector=None):
             'error': str(e)
         }
 
+def get_cached_page_hash(snapshot, selector=None, known_raw_key=None):
+    """Hash a site's last fetched body from the on-disk body cache, without network access"""
+    digest = snapshot.get('body_digest')
+    body = body_cache.get(digest) if digest else None
+    if body is None:
+        return {
+            'hash': None,
+            'title': None,
+            'status': 'error',
+            'error': 'Body not in cache (offline check)'
+        }
+    return process_body(body, snapshot.get('encoding'), selector, known_raw_key)
+
 def load_snapshots():
     """Load existing snapshots from JSON"""
     if os.path.exists(SNAPSHOTS_FILE):
@@ -113,89 +186,169 @@ def save_config(config):
     with open(CONFIG_FILE, 'w') as f:
         json.dump(config, f, indent=2)
 
-def check_all_sites():
-    """Check all monitored sites for changes"""
+# Results of a running check that save_snapshots()/save_config() haven't
+# written yet, so /api/sites can resync a dashboard mid-run.
+# url -> {'snapshot': ..., 'title': ...}
+_unsaved_results = {}
+_unsaved_lock = threading.Lock()
+
+def unsaved_results():
+    """Return a copy of check results not yet written to disk"""
+    with _unsaved_lock:
+        return {url: dict(result) for url, result in _unsaved_results.items()}
+
+def _record_result(url, **fields):
+    with _unsaved_lock:
+        _unsaved_results.setdefault(url, {}).update(fields)
+
+def publish_status(url, snapshot):
+    """Tell connected dashboards about a site's latest check result"""
+    # Record first, so a dashboard reloading after this event sees the result
+    _record_result(url, snapshot=dict(snapshot))
+    events.publish('site_status', {
+        'url': url,
+        'status': snapshot.get('status', 'unknown'),
+        'last_check': snapshot.get('last_check', 'Never'),
+        'last_changed': snapshot.get('last_changed')
+    })
+
+def check_all_sites(offline=False, urls=None):
+    """Check all monitored sites for changes.
+    With offline=True, sites are re-hashed from the body cache instead of fetched.
+    If urls is given, only those sites are checked; the rest are left as they are."""
     config = load_config()
     snapshots = load_snapshots()
     changes = []
     config_changed = False
 
-    for site in config['sites']:
-        url = site['url']
-        category = site.get('category', 'Uncategorized')
-        selector = site.get('selector', None)
-
-        print(f"Checking: {url}")
-        if selector:
-            print(f"  Using selector: {selector}")
-
-        result = get_page_hash(url, selector)
-        current_time = datetime.now().isoformat()
-
-        # Update title if we got one (skip if manually edited)
-        if result.get('title') and result['title'] != site.get('title') and not site.get('title_locked'):
-            site['title'] = result['title']
-            config_changed = True
-            print(f"  Updated title: {result['title']}")
-
-        if result['status'] == 'error':
-            # Update snapshot with error status
-            snapshots[url] = {
-                'last_check': current_time,
-                'status': 'error',
-                'error': result['error']
-            }
-            print(f"  ✗ Error: {result['error']}")
-            continue
+    sites = [site for site in config['sites'] if urls is None or site['url'] in urls]
+
+    # Resolve every hostname up front, in parallel, so slow resolvers show up
+    # as DNS time here instead of stalling individual fetches
+    dns = None
+    if not offline:
+        dns = resolver.prefetch([site['url'] for site in sites])
+        print(f"Resolved {dns['hosts']} host(s) in {dns['elapsed'] * 1000:.0f} ms "
+              f"({dns['cached']} cached, {dns['failed']} failed)")
+
+    try:
+        for site in sites:
+            url = site['url']
+            category = site.get('category', 'Uncategorized')
+            selector = site.get('selector', None)
+
+            print(f"Checking: {url}")
+            if selector:
+                print(f"  Using selector: {selector}")
+
+            host = resolver.hostname_of(url)
+            if dns is not None and host in dns['timings']:
+                dns_time = dns['timings'][host]
+                print(f"  DNS: {'cached' if dns_time is None else f'{dns_time * 1000:.0f} ms'}")
+
+            # Raw key from the last successful check, for the identical-body shortcut
+            previous = snapshots.get(url, {})
+            known_raw_key = previous.get('raw_key') if previous.get('hash') else None
+
+            if offline:
+                result = get_cached_page_hash(previous, selector, known_raw_key)
+            else:
+                result = get_page_hash(url, selector, known_raw_key)
+            current_time = datetime.now().isoformat()
+
+            # Update title if we got one (skip if manually edited)
+            if result.get('title') and result['title'] != site.get('title') and not site.get('title_locked'):
+                site['title'] = result['title']
+                config_changed = True
+                _record_result(url, title=result['title'])
+                events.publish('site_title', {'url': url, 'title': result['title']})
+                print(f"  Updated title: {result['title']}")
+
+            if offline and result['status'] == 'error':
+                # Nothing cached to re-check; leave the last real result alone
+                print(f"  - Skipped: {result['error']}")
+                continue
+
+            if result['status'] == 'error':
+                # Update snapshot with error status
+                snapshots[url] = {
+                    'last_check': current_time,
+                    'status': 'error',
+                    'error': result['error']
+                }
+                publish_status(url, snapshots[url])
+                print(f"  ✗ Error: {result['error']}")
+                continue
         
-        current_hash = result['hash']
+            if result.get('unchanged'):
+                # Identical raw body - reuse the stored hash without reparsing
+                current_hash = previous['hash']
+            else:
+                current_hash = result['hash']
         
-        # Check if this is a new site or if content changed
-        if url not in snapshots:
-            # First time checking this site
-            snapshots[url] = {
-                'hash': current_hash,
-                'last_check': current_time,
-                'status': 'baseline'
-            }
-            print(f"  → Baseline recorded")
-        else:
-            previous_hash = snapshots[url].get('hash')
-            
-            if previous_hash != current_hash:
-                # Content changed!
-                changes.append({
-                    'url': url,
-                    'category': category,
-                    'previous_hash': previous_hash,
-                    'new_hash': current_hash,
-                    'detected_at': current_time
-                })
-
+            # Check if this is a new site or if content changed
+            if url not in snapshots:
+                # First time checking this site
                 snapshots[url] = {
                     'hash': current_hash,
                     'last_check': current_time,
-                    'last_changed': current_time,
-                    'status': 'changed',
-                    'previous_hash': previous_hash
+                    'status': 'baseline'
                 }
-                print(f"  ✓ CHANGE DETECTED!")
+                print(f"  → Baseline recorded")
             else:
-                # No change - update check time but preserve last_changed
-                snapshots[url]['last_check'] = current_time
-                snapshots[url]['status'] = 'unchanged'
-                print(f"  - No change")
-
-    save_snapshots(snapshots)
-
-    # Save config if titles were updated
-    if config_changed:
-        save_config(config)
+                previous_hash = snapshots[url].get('hash')
+            
+                if previous_hash != current_hash:
+                    # Content changed!
+                    changes.append({
+                        'url': url,
+                        'category': category,
+                        'previous_hash': previous_hash,
+                        'new_hash': current_hash,
+                        'detected_at': current_time
+                    })
+
+                    snapshots[url] = {
+                        'hash': current_hash,
+                        'last_check': current_time,
+                        'last_changed': current_time,
+                        'status': 'changed',
+                        'previous_hash': previous_hash
+                    }
+                    print(f"  ✓ CHANGE DETECTED!")
+                else:
+                    # No change - update check time but preserve last_changed
+                    snapshots[url]['last_check'] = current_time
+                    snapshots[url]['status'] = 'unchanged'
+                    print(f"  - No change")
+
+            snapshots[url]['raw_key'] = result['raw_key']
+            snapshots[url]['body_digest'] = result['body_digest']
+            snapshots[url]['encoding'] = result['encoding']
+            publish_status(url, snapshots[url])
+
+        save_snapshots(snapshots)
+
+        if body_cache.enabled():
+            body_cache.evict()
+
+        # Save config if titles were updated
+        if config_changed:
+            save_config(config)
+    finally:
+        # Saved or not, this run's results must not outlive it: after a
+        # failure /api/sites would keep serving snapshots never written to disk
+        with _unsaved_lock:
+            for site in sites:
+                _unsaved_results.pop(site['url'], None)
 
     return changes
 
 if __name__ == '__main__':
     # For testing
+    from dotenv import load_dotenv
+    load_dotenv()
+
     print("Running manual check...")
     changes = check_all_sites()
     if changes:
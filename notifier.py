@@ -1,31 +1,35 @@
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
 from datetime import datetime
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
-
-# Email configuration - set these in your .env file (see .env.example)
-SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.mail.me.com')
-SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
-SMTP_USERNAME = os.getenv('SMTP_USERNAME', '')
-SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
-FROM_EMAIL = os.getenv('FROM_EMAIL', '')
-TO_EMAIL = os.getenv('TO_EMAIL', '')
+def email_settings():
+    """Email configuration - set these in your .env file (see .env.example).
+    Read on use, so entry points can load .env first."""
+    return {
+        'smtp_server': os.getenv('SMTP_SERVER', 'smtp.mail.me.com'),
+        'smtp_port': int(os.getenv('SMTP_PORT', '587')),
+        'smtp_username': os.getenv('SMTP_USERNAME', ''),
+        'smtp_password': os.getenv('SMTP_PASSWORD', ''),
+        'from_email': os.getenv('FROM_EMAIL', ''),
+        'to_email': os.getenv('TO_EMAIL', '')
+    }
 
 def send_digest_email(changes):
     """Send a single digest email with all detected changes"""
     
     if not changes:
         return
-    
+
+    import smtplib
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+
+    settings = email_settings()
+
     # Create message
     msg = MIMEMultipart('alternative')
     msg['Subject'] = f'Website Monitor: {len(changes)} Change(s) Detected'
-    msg['From'] = FROM_EMAIL
-    msg['To'] = TO_EMAIL
+    msg['From'] = settings['from_email']
+    msg['To'] = settings['to_email']
     
     # Build email body
     text_parts = [
@@ -87,18 +91,18 @@ def send_digest_email(changes):
     
     # Send email
     try:
-        print(f"Connecting to {SMTP_SERVER}:{SMTP_PORT}...")
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
+        print(f"Connecting to {settings['smtp_server']}:{settings['smtp_port']}...")
+        server = smtplib.SMTP(settings['smtp_server'], settings['smtp_port'])
         server.starttls()
         
         print("Logging in...")
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
+        server.login(settings['smtp_username'], settings['smtp_password'])
         
         print("Sending email...")
         server.send_message(msg)
         server.quit()
         
-        print(f"✓ Digest email sent successfully to {TO_EMAIL}")
+        print(f"✓ Digest email sent successfully to {settings['to_email']}")
         return True
         
     except Exception as e:
@@ -127,5 +131,8 @@ def test_email_config():
         print("4. Use that password in notifier.py (not your regular password)")
 
 if __name__ == '__main__':
+    from dotenv import load_dotenv
+    load_dotenv()
+
     # Run email test
     test_email_config()
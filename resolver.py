@@ -0,0 +1,221 @@
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+# How long resolved addresses are reused when the resolver doesn't report a TTL.
+# The system resolver (getaddrinfo) never exposes record TTLs, so this applies to it.
+DEFAULT_TTL = 300
+# How long an NXDOMAIN answer is remembered before the name is tried again
+NEGATIVE_TTL = 60
+# Maximum number of lookups in flight at once during a prefetch
+MAX_CONCURRENT_LOOKUPS = 50
+
+# getaddrinfo error codes that mean "this name does not exist"
+NXDOMAIN_ERRORS = {socket.EAI_NONAME}
+if hasattr(socket, 'EAI_NODATA'):
+    NXDOMAIN_ERRORS.add(socket.EAI_NODATA)
+
+# Bound by prefetch() on first use: asyncio is slow to import, and only the
+# coroutines here, which always run under prefetch(), need it
+asyncio = None
+
+class SystemResolver:
+    """Resolve hostnames with the system resolver, off the event loop thread"""
+
+    async def resolve(self, host):
+        """Return (addrinfo list, ttl) for host; raises socket.gaierror on failure"""
+        loop = asyncio.get_running_loop()
+        infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+        return infos, None
+
+class StubResolver:
+    """Resolver that answers from a fixed mapping, for tests and offline runs
+
+    `records` maps hostname -> list of IP address strings. Hostnames that are
+    missing from the mapping resolve as NXDOMAIN.
+    """
+
+    def __init__(self, records, ttl=DEFAULT_TTL, delay=0):
+        self.records = records
+        self.ttl = ttl
+        self.delay = delay
+        self.lookups = []
+
+    async def resolve(self, host):
+        self.lookups.append(host)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if host not in self.records:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+        infos = []
+        for address in self.records[host]:
+            if ':' in address:
+                infos.append((socket.AF_INET6, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (address, 0, 0, 0)))
+            else:
+                infos.append((socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (address, 0)))
+        return infos, self.ttl
+
+class ResolverCache:
+    """Thread-safe hostname cache with per-entry expiry and negative caching"""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, host):
+        """Return the live cache entry for host, or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(host.lower())
+            if entry is None:
+                return None
+            if entry['expires'] <= time.monotonic():
+                del self._entries[host.lower()]
+                return None
+            return entry
+
+    def put(self, host, infos, ttl):
+        with self._lock:
+            self._entries[host.lower()] = {
+                'infos': infos,
+                'error': None,
+                'expires': time.monotonic() + ttl
+            }
+
+    def put_negative(self, host, error):
+        with self._lock:
+            self._entries[host.lower()] = {
+                'infos': None,
+                'error': error,
+                'expires': time.monotonic() + NEGATIVE_TTL
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+# Shared by every check run and worker thread in this process
+cache = ResolverCache()
+
+def hostname_of(url):
+    """Return url's hostname, or None if the URL is malformed"""
+    try:
+        return urlsplit(url).hostname
+    except ValueError:
+        # e.g. an unclosed IPv6 bracket; the fetch reports it as a per-site error
+        return None
+
+def hostnames_for(urls):
+    """Return the unique hostnames of a list of URLs, in first-seen order"""
+    hosts = []
+    seen = set()
+    for url in urls:
+        host = hostname_of(url)
+        if host and host not in seen:
+            seen.add(host)
+            hosts.append(host)
+    return hosts
+
+async def _resolve_all(hosts, resolver, cache):
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_LOOKUPS)
+    stats = {'resolved': 0, 'cached': 0, 'failed': 0, 'timings': {}}
+
+    async def resolve_one(host):
+        if cache.get(host) is not None:
+            stats['cached'] += 1
+            stats['timings'][host] = None
+            return
+
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                infos, ttl = await resolver.resolve(host)
+            except socket.gaierror as e:
+                stats['timings'][host] = time.perf_counter() - started
+                stats['failed'] += 1
+                # Only NXDOMAIN is cached; transient failures are retried at fetch time
+                if e.errno in NXDOMAIN_ERRORS:
+                    cache.put_negative(host, e.strerror or str(e))
+                return
+            except Exception:
+                # OSError, or e.g. UnicodeError from the IDNA codec on a bad name;
+                # never let one host abort the whole prefetch
+                stats['timings'][host] = time.perf_counter() - started
+                stats['failed'] += 1
+                return
+
+            stats['timings'][host] = time.perf_counter() - started
+            cache.put(host, infos, DEFAULT_TTL if ttl is None else ttl)
+            stats['resolved'] += 1
+
+    await asyncio.gather(*(resolve_one(host) for host in hosts))
+    return stats
+
+def prefetch(urls, resolver=None, cache=cache):
+    """Resolve the hostnames of all URLs in parallel and store them in the cache
+
+    Returns a summary dict with the number of hosts resolved, already cached
+    and failed, the total wall-clock resolution time in seconds, and
+    'timings' mapping each host to this run's lookup time (None if cached).
+    """
+    global asyncio
+    import asyncio
+
+    hosts = hostnames_for(urls)
+    started = time.perf_counter()
+    stats = asyncio.run(_resolve_all(hosts, resolver or SystemResolver(), cache))
+    stats['hosts'] = len(hosts)
+    stats['elapsed'] = time.perf_counter() - started
+    return stats
+
+def _with_port(sockaddr, port):
+    return (sockaddr[0], port) + tuple(sockaddr[2:])
+
+_original_getaddrinfo = socket.getaddrinfo
+_install_lock = threading.Lock()
+_install_count = 0
+
+def _cached_getaddrinfo(host, port, family=0, type=0, proto=0, flags=0):
+    """Drop-in for socket.getaddrinfo that answers from the cache when it can"""
+    if isinstance(host, bytes):
+        host = host.decode('idna')
+    if isinstance(port, str) and port.isdigit():
+        port = int(port)
+
+    entry = cache.get(host) if isinstance(host, str) and isinstance(port, int) else None
+    if entry is None or type not in (0, socket.SOCK_STREAM) or flags:
+        return _original_getaddrinfo(host, port, family, type, proto, flags)
+
+    if entry['error'] is not None:
+        raise socket.gaierror(socket.EAI_NONAME, entry['error'])
+
+    return [
+        (af, socktype, sproto, canonname, _with_port(sockaddr, port))
+        for af, socktype, sproto, canonname, sockaddr in entry['infos']
+        if family in (0, socket.AF_UNSPEC, af)
+    ] or _original_getaddrinfo(host, port, family, type, proto, flags)
+
+class cached_lookups:
+    """Context manager that routes socket.getaddrinfo through the cache
+
+    Nested and concurrent uses are reference-counted, so overlapping check runs
+    (scheduled job plus a manual check) don't restore the original too early.
+    """
+
+    def __enter__(self):
+        global _install_count
+        with _install_lock:
+            if _install_count == 0:
+                socket.getaddrinfo = _cached_getaddrinfo
+            _install_count += 1
+        return cache
+
+    def __exit__(self, exc_type, exc, tb):
+        global _install_count
+        with _install_lock:
+            _install_count -= 1
+            if _install_count == 0:
+                socket.getaddrinfo = _original_getaddrinfo
+        return False
+
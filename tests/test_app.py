@@ -0,0 +1,141 @@
+import json
+import queue
+
+import pytest
+
+import app
+import events
+import fetcher
+
+URL = 'https://a.test/jobs'
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    for module in (app, fetcher):
+        monkeypatch.setattr(module, 'CONFIG_FILE', str(tmp_path / 'config.json'))
+        monkeypatch.setattr(module, 'SNAPSHOTS_FILE', str(tmp_path / 'snapshots.json'))
+    monkeypatch.setattr(app, 'DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(app, 'METADATA_FILE', str(tmp_path / 'metadata.json'))
+    app.init_data_files()
+    return app.app.test_client()
+
+@pytest.fixture
+def received():
+    """Collect (event, data) pairs published while the test runs"""
+    q = events.broker.subscribe()
+
+    def drain():
+        messages = []
+        while True:
+            try:
+                message = q.get_nowait()
+            except queue.Empty:
+                return messages
+            lines = dict(line.split(': ', 1) for line in message.strip().split('\n'))
+            messages.append((lines['event'], json.loads(lines['data'])))
+
+    yield drain
+    events.broker.unsubscribe(q)
+
+def add(client, url=URL, category='Jobs'):
+    response = client.post('/api/sites', json={'url': url, 'category': category})
+    assert response.status_code == 200
+
+def test_add_site_publishes_site_added(client, received):
+    add(client)
+
+    [(event, data)] = received()
+    assert event == 'site_added'
+    assert data['site']['url'] == URL
+    assert data['site']['category'] == 'Jobs'
+    assert data['site']['status'] == 'new'
+
+def test_delete_site_publishes_site_removed(client, received):
+    add(client)
+    received()
+
+    client.delete('/api/sites/0')
+    assert received() == [('site_removed', {'url': URL})]
+
+def test_edits_publish_title_and_category(client, received):
+    add(client)
+    received()
+
+    client.patch('/api/sites/0/title', json={'title': 'Careers'})
+    client.patch('/api/sites/0/category', json={'category': 'Work'})
+    assert received() == [
+        ('site_title', {'url': URL, 'title': 'Careers'}),
+        ('site_category', {'url': URL, 'category': 'Work'}),
+    ]
+
+def test_rejected_edits_publish_nothing(client, received):
+    add(client)
+    received()
+
+    client.patch('/api/sites/5/title', json={'title': 'Careers'})
+    client.patch('/api/sites/0/title', json={'title': ''})
+    client.post('/api/sites', json={'url': URL})
+    assert received() == []
+
+def test_check_all_sites_publishes_status_and_title(client, received, monkeypatch):
+    add(client)
+    received()
+    monkeypatch.setattr(fetcher.resolver, 'prefetch',
+                        lambda urls: {'hosts': 1, 'elapsed': 0, 'cached': 0, 'failed': 0, 'timings': {}})
+    monkeypatch.setattr(fetcher, 'get_page_hash', lambda url, selector, known_raw_key: fetcher.process_body(
+        b'<html><title>Jobs page</title><body>Hi</body></html>', 'utf-8', selector, known_raw_key))
+
+    fetcher.check_all_sites()
+
+    [(title_event, title), (status_event, status)] = received()
+    assert (title_event, title) == ('site_title', {'url': URL, 'title': 'Jobs page'})
+    assert status_event == 'site_status'
+    assert status['url'] == URL
+    assert status['status'] == 'baseline'
+
+def test_sites_overlay_unsaved_results(client, monkeypatch):
+    add(client)
+    monkeypatch.setattr(fetcher, '_unsaved_results', {
+        URL: {'snapshot': {'status': 'changed', 'last_check': '2026-01-01T09:00:00',
+                           'last_changed': '2026-01-01T09:00:00'},
+              'title': 'Mid-run title'}
+    })
+
+    [site] = client.get('/api/sites').get_json()
+    assert site['status'] == 'changed'
+    assert site['last_changed'] == '2026-01-01T09:00:00'
+    assert site['title'] == 'Mid-run title'
+
+def test_failed_run_does_not_leave_unsaved_results(client, monkeypatch):
+    add(client)
+    add(client, 'https://b.test/')
+    monkeypatch.setattr(fetcher.resolver, 'prefetch',
+                        lambda urls: {'hosts': 2, 'elapsed': 0, 'cached': 0, 'failed': 0, 'timings': {}})
+
+    def get_page_hash(url, selector, known_raw_key):
+        if url != URL:
+            raise RuntimeError('boom')
+        return fetcher.process_body(b'<html>Hi</html>', 'utf-8', selector, known_raw_key)
+    monkeypatch.setattr(fetcher, 'get_page_hash', get_page_hash)
+
+    with pytest.raises(RuntimeError):
+        fetcher.check_all_sites()
+
+    assert fetcher.unsaved_results() == {}
+    assert [s['status'] for s in client.get('/api/sites').get_json()] == ['new', 'new']
+
+def test_event_stream_sends_retry_then_queued_messages(client):
+    response = client.get('/api/events')
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+
+    chunks = iter(response.response)
+    try:
+        assert _text(next(chunks)) == 'retry: 5000\n\n'
+        events.publish('site_removed', {'url': URL})
+        assert _text(next(chunks)).endswith(f'event: site_removed\ndata: {json.dumps({"url": URL})}\n\n')
+    finally:
+        response.close()
+
+def _text(chunk):
+    return chunk.decode('utf-8') if isinstance(chunk, bytes) else chunk
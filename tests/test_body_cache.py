@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+import body_cache
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    path = tmp_path / 'bodies'
+    monkeypatch.setattr(body_cache, 'BODY_CACHE_DIR', str(path))
+    monkeypatch.setenv('BODY_CACHE_MB', '1')
+    return path
+
+def test_disabled_cache_stores_nothing(cache_dir, monkeypatch):
+    monkeypatch.setenv('BODY_CACHE_MB', '0')
+    body_cache.put('abc', b'body')
+    assert not cache_dir.exists()
+
+def test_put_then_get(cache_dir):
+    body_cache.put('abc', b'body')
+    body_cache.put('abc', b'body')
+
+    assert body_cache.get('abc') == b'body'
+    assert body_cache.get('missing') is None
+    assert os.listdir(cache_dir) == ['abc']
+
+def test_evict_removes_least_recently_used(cache_dir):
+    for i in range(4):
+        body_cache.put(f'd{i}', b'x' * 400_000)
+        os.utime(cache_dir / f'd{i}', (i, i))
+    body_cache.get('d0')  # Recently used again
+
+    assert body_cache.evict() == 2
+    assert sorted(os.listdir(cache_dir)) == ['d0', 'd3']
+
+def test_write_failure_does_not_raise(cache_dir, capsys):
+    # A file where the cache directory should be makes every write fail
+    cache_dir.write_text('not a directory')
+
+    body_cache.put('abc', b'body')
+    assert 'Body cache write failed' in capsys.readouterr().out
+    assert body_cache.get('abc') is None
+    assert body_cache.evict() == 0
+
+def test_touch_failure_still_returns_body(cache_dir, monkeypatch, capsys):
+    body_cache.put('abc', b'body')
+
+    def fail(*args):
+        raise PermissionError('read-only')
+    monkeypatch.setattr(body_cache.os, 'utime', fail)
+
+    assert body_cache.get('abc') == b'body'
+    assert 'Body cache touch failed' in capsys.readouterr().out
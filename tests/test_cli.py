@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import cli
+import fetcher
+
+@pytest.fixture
+def config_file(tmp_path, monkeypatch):
+    path = tmp_path / 'config.json'
+    monkeypatch.setattr(fetcher, 'CONFIG_FILE', str(path))
+    return path
+
+def run_import(tmp_path, content, *extra):
+    source = tmp_path / 'import.txt'
+    source.write_text(content)
+    cli.main(['import', str(source), *extra])
+
+def test_import_url_list_skips_comments_and_duplicates(tmp_path, config_file):
+    run_import(tmp_path, 'example.com\n   # indented comment\n\nhttps://example.com\nhttp://b.test/\n',
+               '--category', 'News')
+
+    sites = json.loads(config_file.read_text())['sites']
+    assert [s['url'] for s in sites] == ['https://example.com', 'http://b.test/']
+    assert all(s['category'] == 'News' for s in sites)
+
+def test_import_config_export(tmp_path, config_file):
+    run_import(tmp_path, json.dumps({'sites': [{'url': 'a.test', 'category': 'Jobs', 'selector': '#main'}]}))
+
+    [site] = json.loads(config_file.read_text())['sites']
+    assert site['url'] == 'https://a.test'
+    assert site['category'] == 'Jobs'
+    assert site['selector'] == '#main'
+
+@pytest.mark.parametrize('content', ['42', '"example.com"', 'null', '[1, 2]', '{"sites": 5}',
+                                     '[{"url": 3}]'])
+def test_import_rejects_unexpected_json(tmp_path, config_file, capsys, content):
+    with pytest.raises(SystemExit) as exit_info:
+        run_import(tmp_path, content)
+
+    assert exit_info.value.code == 1
+    assert 'Cannot import' in capsys.readouterr().out
+    assert not config_file.exists()
+
+@pytest.mark.parametrize('repeat', ['0', '-2'])
+def test_bench_rejects_repeat_below_one(capsys, repeat):
+    with pytest.raises(SystemExit) as exit_info:
+        cli.main(['bench', '--repeat', repeat])
+
+    assert exit_info.value.code == 2
+    assert 'must be at least 1' in capsys.readouterr().err
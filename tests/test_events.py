@@ -0,0 +1,48 @@
+import json
+import queue
+
+import events
+
+def drain(q):
+    messages = []
+    while True:
+        try:
+            messages.append(q.get_nowait())
+        except queue.Empty:
+            return messages
+
+def test_publish_formats_sse_message_with_increasing_ids():
+    broker = events.EventBroker()
+    q = broker.subscribe()
+    broker.publish('site_title', {'url': 'https://a.test', 'title': 'A'})
+    broker.publish('site_removed', {'url': 'https://a.test'})
+
+    first, second = drain(q)
+    assert first.startswith('id: 1\nevent: site_title\ndata: ')
+    assert first.endswith('\n\n')
+    assert json.loads(first.split('data: ')[1]) == {'url': 'https://a.test', 'title': 'A'}
+    assert second.startswith('id: 2\nevent: site_removed\n')
+
+def test_unsubscribed_clients_get_nothing():
+    broker = events.EventBroker()
+    q = broker.subscribe()
+    broker.unsubscribe(q)
+    broker.publish('site_removed', {'url': 'https://a.test'})
+    assert drain(q) == []
+
+def test_stalled_client_is_dropped_without_affecting_others(monkeypatch):
+    monkeypatch.setattr(events, 'MAX_PENDING_EVENTS', 3)
+    broker = events.EventBroker()
+    stalled = broker.subscribe()
+    reader = broker.subscribe()
+
+    for i in range(4):
+        broker.publish('site_status', {'url': f'https://{i}.test'})
+        drain(reader)
+
+    # The stalled queue is emptied and ends with the disconnect sentinel
+    assert drain(stalled) == [None]
+
+    broker.publish('site_status', {'url': 'https://later.test'})
+    assert drain(stalled) == []
+    assert len(drain(reader)) == 1
@@ -0,0 +1,90 @@
+import functools
+import json
+
+import pytest
+
+import fetcher
+import resolver
+
+PAGE = b'<html><head><title>Jobs</title></head><body><div id="main">Open roles</div></body></html>'
+
+def test_unknown_charset_falls_back_to_utf8():
+    result = fetcher.process_body(PAGE, 'x-bogus-charset')
+
+    assert result['status'] == 'success'
+    assert result['title'] == 'Jobs'
+    assert result['hash'] == fetcher.process_body(PAGE, None)['hash']
+
+def test_identical_body_skips_parsing(monkeypatch):
+    first = fetcher.process_body(PAGE, 'utf-8')
+
+    def fail(*args, **kwargs):
+        raise AssertionError('identical body should not be parsed')
+    monkeypatch.setattr(fetcher, 'hash_content', fail)
+
+    second = fetcher.process_body(PAGE, 'utf-8', known_raw_key=first['raw_key'])
+    assert second['unchanged'] is True
+    assert second['raw_key'] == first['raw_key']
+
+@pytest.mark.parametrize('changed', [
+    {'body': PAGE.replace(b'Open', b'Closed')},
+    {'selector': '#main'},
+    {'encoding': 'iso-8859-1'},
+])
+def test_raw_key_changes_with_body_selector_and_encoding(changed):
+    args = {'body': PAGE, 'encoding': 'utf-8', 'selector': None}
+    key = fetcher.process_body(**args)['raw_key']
+    args.update(changed)
+
+    result = fetcher.process_body(**args, known_raw_key=key)
+    assert not result.get('unchanged')
+    assert result['hash'] is not None
+
+def test_check_all_sites_reuses_hash_for_identical_body(tmp_path, monkeypatch):
+    url = 'https://a.test/jobs'
+    monkeypatch.setattr(fetcher, 'CONFIG_FILE', str(tmp_path / 'config.json'))
+    monkeypatch.setattr(fetcher, 'SNAPSHOTS_FILE', str(tmp_path / 'snapshots.json'))
+    fetcher.save_config({'sites': [{'url': url, 'category': 'Jobs', 'title': 'Jobs'}]})
+    fetcher.save_snapshots({})
+
+    stub = resolver.StubResolver({'a.test': ['10.0.0.1']})
+    monkeypatch.setattr(resolver, 'prefetch', functools.partial(resolver.prefetch, resolver=stub))
+    monkeypatch.setattr(fetcher, 'get_page_hash',
+                        lambda url, selector, known_raw_key: fetcher.process_body(PAGE, 'utf-8', selector, known_raw_key))
+
+    fetcher.check_all_sites()
+    baseline = json.loads((tmp_path / 'snapshots.json').read_text())[url]
+    assert baseline['status'] == 'baseline'
+
+    parsed = []
+    monkeypatch.setattr(fetcher, 'hash_content', lambda *args: parsed.append(args))
+    assert fetcher.check_all_sites() == []
+
+    snapshot = json.loads((tmp_path / 'snapshots.json').read_text())[url]
+    assert parsed == []
+    assert snapshot['status'] == 'unchanged'
+    assert snapshot['hash'] == baseline['hash']
+    assert snapshot['raw_key'] == baseline['raw_key']
+
+def test_malformed_url_gets_a_per_site_error(tmp_path, monkeypatch):
+    good, bad = 'https://a.test/jobs', 'https://[fe80::1'
+    monkeypatch.setattr(fetcher, 'CONFIG_FILE', str(tmp_path / 'config.json'))
+    monkeypatch.setattr(fetcher, 'SNAPSHOTS_FILE', str(tmp_path / 'snapshots.json'))
+    fetcher.save_config({'sites': [{'url': bad}, {'url': good}]})
+    fetcher.save_snapshots({})
+
+    stub = resolver.StubResolver({'a.test': ['10.0.0.1']})
+    monkeypatch.setattr(resolver, 'prefetch', functools.partial(resolver.prefetch, resolver=stub))
+    real_get_page_hash = fetcher.get_page_hash
+
+    def get_page_hash(url, selector, known_raw_key):
+        if url == good:
+            return fetcher.process_body(PAGE, 'utf-8', selector, known_raw_key)
+        return real_get_page_hash(url, selector, known_raw_key)
+    monkeypatch.setattr(fetcher, 'get_page_hash', get_page_hash)
+
+    fetcher.check_all_sites()
+
+    snapshots = json.loads((tmp_path / 'snapshots.json').read_text())
+    assert snapshots[bad]['status'] == 'error'
+    assert snapshots[good]['status'] == 'baseline'
@@ -0,0 +1,37 @@
+import smtplib
+
+import notifier
+
+class FakeSMTP:
+    sent = []
+
+    def __init__(self, server, port):
+        self.address = (server, port)
+
+    def starttls(self):
+        pass
+
+    def login(self, username, password):
+        self.credentials = (username, password)
+
+    def send_message(self, msg):
+        FakeSMTP.sent.append((self.address, self.credentials, msg['From'], msg['To']))
+
+    def quit(self):
+        pass
+
+def test_settings_are_read_when_sending(monkeypatch):
+    # Set after import: nothing may be frozen at import time
+    monkeypatch.setenv('SMTP_SERVER', 'smtp.example.test')
+    monkeypatch.setenv('SMTP_PORT', '2525')
+    monkeypatch.setenv('SMTP_USERNAME', 'user')
+    monkeypatch.setenv('SMTP_PASSWORD', 'secret')
+    monkeypatch.setenv('FROM_EMAIL', 'from@example.test')
+    monkeypatch.setenv('TO_EMAIL', 'to@example.test')
+    monkeypatch.setattr(smtplib, 'SMTP', FakeSMTP)
+    FakeSMTP.sent.clear()
+
+    changes = [{'url': 'https://a.test', 'category': 'Jobs', 'detected_at': '2026-01-01T09:00:00'}]
+    assert notifier.send_digest_email(changes) is True
+    assert FakeSMTP.sent == [(('smtp.example.test', 2525), ('user', 'secret'),
+                              'from@example.test', 'to@example.test')]
@@ -0,0 +1,110 @@
+import socket
+
+import pytest
+
+import resolver
+
+class FlakyResolver(resolver.StubResolver):
+    """Stub that fails with a temporary resolver error for the given hosts"""
+
+    def __init__(self, records, failing):
+        super().__init__(records)
+        self.failing = failing
+
+    async def resolve(self, host):
+        if host in self.failing:
+            self.lookups.append(host)
+            raise socket.gaierror(socket.EAI_AGAIN, 'Temporary failure in name resolution')
+        return await super().resolve(host)
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    resolver.cache.clear()
+    yield
+    resolver.cache.clear()
+
+def test_prefetch_resolves_each_host_once():
+    stub = resolver.StubResolver({'a.test': ['10.0.0.1']})
+    stats = resolver.prefetch(['https://a.test/one', 'http://a.test/two'], stub)
+
+    assert stub.lookups == ['a.test']
+    assert stats['hosts'] == 1
+    assert stats['resolved'] == 1
+    assert stats['timings']['a.test'] is not None
+
+def test_second_run_reports_cache_hits():
+    stub = resolver.StubResolver({'a.test': ['10.0.0.1']})
+    resolver.prefetch(['https://a.test/'], stub)
+    stats = resolver.prefetch(['https://a.test/'], stub)
+
+    assert stub.lookups == ['a.test']
+    assert stats['cached'] == 1
+    assert stats['timings'] == {'a.test': None}
+
+def test_entries_expire_after_ttl(monkeypatch):
+    stub = resolver.StubResolver({'a.test': ['10.0.0.1']}, ttl=30)
+    resolver.prefetch(['https://a.test/'], stub)
+    assert resolver.cache.get('a.test') is not None
+
+    now = resolver.time.monotonic()
+    monkeypatch.setattr(resolver.time, 'monotonic', lambda: now + 31)
+    assert resolver.cache.get('a.test') is None
+
+def test_nxdomain_is_cached_negatively():
+    stub = resolver.StubResolver({})
+    stats = resolver.prefetch(['https://missing.test/'], stub)
+    assert stats['failed'] == 1
+
+    stats = resolver.prefetch(['https://missing.test/'], stub)
+    assert stats['cached'] == 1
+    assert stub.lookups == ['missing.test']
+
+    with resolver.cached_lookups():
+        with pytest.raises(socket.gaierror):
+            socket.getaddrinfo('missing.test', 443)
+
+def test_transient_failures_are_not_cached():
+    stub = FlakyResolver({'a.test': ['10.0.0.1']}, failing={'a.test'})
+    resolver.prefetch(['https://a.test/'], stub)
+    assert resolver.cache.get('a.test') is None
+
+    resolver.prefetch(['https://a.test/'], stub)
+    assert stub.lookups == ['a.test', 'a.test']
+
+def test_hook_answers_with_callers_port():
+    stub = resolver.StubResolver({'a.test': ['10.0.0.1', '::1']})
+    resolver.prefetch(['https://a.test/'], stub)
+
+    with resolver.cached_lookups():
+        infos = socket.getaddrinfo('a.test', 8443, socket.AF_INET, socket.SOCK_STREAM)
+    assert [info[4] for info in infos] == [('10.0.0.1', 8443)]
+    assert socket.getaddrinfo is resolver._original_getaddrinfo
+
+def test_nested_hooks_restore_original_once():
+    with resolver.cached_lookups():
+        with resolver.cached_lookups():
+            pass
+        assert socket.getaddrinfo is resolver._cached_getaddrinfo
+    assert socket.getaddrinfo is resolver._original_getaddrinfo
+
+def test_malformed_url_is_skipped():
+    stub = resolver.StubResolver({'a.test': ['10.0.0.1']})
+    stats = resolver.prefetch(['https://[fe80::1', 'https://a.test/'], stub)
+
+    assert stub.lookups == ['a.test']
+    assert stats['hosts'] == 1
+    assert stats['resolved'] == 1
+
+def test_unexpected_resolver_errors_count_as_failed():
+    class BrokenResolver(resolver.StubResolver):
+        async def resolve(self, host):
+            if host == 'bad.test':
+                raise UnicodeError('label too long')
+            return await super().resolve(host)
+
+    stub = BrokenResolver({'a.test': ['10.0.0.1']})
+    stats = resolver.prefetch(['https://bad.test/', 'https://a.test/'], stub)
+
+    assert stats['failed'] == 1
+    assert stats['resolved'] == 1
+    assert resolver.cache.get('bad.test') is None